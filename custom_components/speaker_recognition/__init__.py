@@ -2,56 +2,83 @@
 
 from __future__ import annotations
 
+from collections.abc import Awaitable, Callable
+from typing import Final
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 
 from .const import (
     CONF_BACKEND_URL,
     CONF_ENTRY_TYPE,
     CONF_VOICE_SAMPLES,
+    DATA_MAIN_ENTRY_ID,
     DEFAULT_BACKEND_URL,
+    DOMAIN,
+    ENTRY_TYPE_CONVERSATION,
     ENTRY_TYPE_MAIN,
     ENTRY_TYPE_STT,
 )
 from .recognition import SpeakerRecognition
 
 type SpeakerRecognitionConfigEntry = ConfigEntry[SpeakerRecognition]
+type _EntryHandler = Callable[[HomeAssistant, ConfigEntry], Awaitable[bool]]
+
+_STT_PLATFORMS: Final = (Platform.STT,)
+_CONVERSATION_PLATFORMS: Final = (Platform.CONVERSATION,)
 
 
-def _get_main_entry(hass: HomeAssistant) -> ConfigEntry | None:
-    """Get the main config entry."""
-    entries = hass.config_entries.async_entries(__name__.rsplit(".", maxsplit=1)[-1])
-    for entry in entries:
+@callback
+def _main_entry(hass: HomeAssistant) -> ConfigEntry | None:
+    """Get the main config entry, caching its ID in hass.data."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+
+    if (entry_id := domain_data.get(DATA_MAIN_ENTRY_ID)) is not None:
+        if (entry := hass.config_entries.async_get_entry(entry_id)) is not None:
+            return entry
+        domain_data.pop(DATA_MAIN_ENTRY_ID, None)
+
+    for entry in hass.config_entries.async_entries(DOMAIN):
         if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_MAIN:
+            domain_data[DATA_MAIN_ENTRY_ID] = entry.entry_id
             return entry
     return None
 
 
+def _get_backend_url(entry: ConfigEntry) -> str:
+    """Get the backend URL, preferring the value from the options flow."""
+    return entry.options.get(
+        CONF_BACKEND_URL, entry.data.get(CONF_BACKEND_URL, DEFAULT_BACKEND_URL)
+    )
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Speaker Recognition from a config entry."""
-    entry_type = entry.data.get(CONF_ENTRY_TYPE, ENTRY_TYPE_MAIN)
-
-    if entry_type == ENTRY_TYPE_MAIN:
-        return await async_setup_main_entry(hass, entry)
-    if entry_type == ENTRY_TYPE_STT:
-        return await async_setup_stt_entry(hass, entry)
-    return await async_setup_conversation_entry(hass, entry)
+    return await _SETUP[entry.data.get(CONF_ENTRY_TYPE, ENTRY_TYPE_MAIN)](hass, entry)
 
 
 async def async_setup_main_entry(
     hass: HomeAssistant, entry: SpeakerRecognitionConfigEntry
 ) -> bool:
     """Set up main config entry."""
-    backend_url = entry.data.get(CONF_BACKEND_URL, DEFAULT_BACKEND_URL)
+    backend_url = _get_backend_url(entry)
     voice_samples = entry.options.get(CONF_VOICE_SAMPLES, [])
 
     recognition = SpeakerRecognition(hass, voice_samples, backend_url)
 
     if voice_samples:
-        await recognition.async_train()
+        recognition.async_start_training(entry)
 
     entry.runtime_data = recognition
+    hass.data.setdefault(DOMAIN, {})[DATA_MAIN_ENTRY_ID] = entry.entry_id
+
+    @callback
+    def _clear_main_entry_id() -> None:
+        """Forget the cached main entry ID."""
+        hass.data.get(DOMAIN, {}).pop(DATA_MAIN_ENTRY_ID, None)
+
+    entry.async_on_unload(_clear_main_entry_id)
     entry.async_on_unload(entry.add_update_listener(async_update_main_listener))
 
     return True
@@ -59,11 +86,11 @@ async def async_setup_main_entry(
 
 async def async_setup_stt_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up STT proxy entry."""
-    main_entry = _get_main_entry(hass)
+    main_entry = _main_entry(hass)
     if main_entry is None:
         return False
 
-    await hass.config_entries.async_forward_entry_setups(entry, [Platform.STT])
+    await hass.config_entries.async_forward_entry_setups(entry, _STT_PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(async_update_stt_listener))
 
     return True
@@ -73,11 +100,11 @@ async def async_setup_conversation_entry(
     hass: HomeAssistant, entry: ConfigEntry
 ) -> bool:
     """Set up Conversation proxy entry."""
-    main_entry = _get_main_entry(hass)
+    main_entry = _main_entry(hass)
     if main_entry is None:
         return False
 
-    await hass.config_entries.async_forward_entry_setups(entry, [Platform.CONVERSATION])
+    await hass.config_entries.async_forward_entry_setups(entry, _CONVERSATION_PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(async_update_conversation_listener))
 
     return True
@@ -85,28 +112,49 @@ async def async_setup_conversation_entry(
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    entry_type = entry.data.get(CONF_ENTRY_TYPE, ENTRY_TYPE_MAIN)
+    return await _UNLOAD[entry.data.get(CONF_ENTRY_TYPE, ENTRY_TYPE_MAIN)](hass, entry)
+
+
+async def async_unload_main_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Unload main config entry."""
+    return True
+
 
-    if entry_type == ENTRY_TYPE_MAIN:
-        return True
+async def async_unload_stt_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Unload STT proxy entry."""
+    return await hass.config_entries.async_unload_platforms(entry, _STT_PLATFORMS)
 
-    platforms = (
-        [Platform.STT] if entry_type == ENTRY_TYPE_STT else [Platform.CONVERSATION]
+
+async def async_unload_conversation_entry(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> bool:
+    """Unload Conversation proxy entry."""
+    return await hass.config_entries.async_unload_platforms(
+        entry, _CONVERSATION_PLATFORMS
     )
-    return await hass.config_entries.async_unload_platforms(entry, platforms)
 
 
 async def async_update_main_listener(
     hass: HomeAssistant, entry: SpeakerRecognitionConfigEntry
 ) -> None:
     """Handle main config options update."""
+    recognition = entry.runtime_data
+
+    # A new backend needs a fresh client, which only a reload provides
+    if _get_backend_url(entry) != recognition.base_url:
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    # Saving unchanged samples still retries a training that failed
     voice_samples = entry.options.get(CONF_VOICE_SAMPLES, [])
-    entry.runtime_data.update_voice_samples(voice_samples)
+    if voice_samples == recognition.voice_samples and recognition.is_trained:
+        return
 
-    if voice_samples:
-        await entry.runtime_data.async_train()
+    # Retrain in place instead of reloading, which would train a second time
+    recognition.update_voice_samples(voice_samples)
 
-    await hass.config_entries.async_reload(entry.entry_id)
+    if voice_samples:
+        recognition.async_start_training(entry)
 
 
 async def async_update_stt_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
@@ -119,3 +167,16 @@ async def async_update_conversation_listener(
 ) -> None:
     """Handle Conversation proxy options update."""
     await hass.config_entries.async_reload(entry.entry_id)
+
+
+_SETUP: dict[str, _EntryHandler] = {
+    ENTRY_TYPE_MAIN: async_setup_main_entry,
+    ENTRY_TYPE_STT: async_setup_stt_entry,
+    ENTRY_TYPE_CONVERSATION: async_setup_conversation_entry,
+}
+
+_UNLOAD: dict[str, _EntryHandler] = {
+    ENTRY_TYPE_MAIN: async_unload_main_entry,
+    ENTRY_TYPE_STT: async_unload_stt_entry,
+    ENTRY_TYPE_CONVERSATION: async_unload_conversation_entry,
+}
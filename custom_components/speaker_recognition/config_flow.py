@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Any
 
 import voluptuous as vol
@@ -16,6 +17,7 @@ from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import selector
 
+from . import _get_backend_url, _main_entry
 from .const import (
     CONF_BACKEND_URL,
     CONF_CONVERSATION_ENTITY,
@@ -25,6 +27,7 @@ from .const import (
     CONF_STT_ENTITY,
     CONF_USER,
     CONF_VOICE_SAMPLES,
+    DATA_USERS_SCHEMA,
     DEFAULT_BACKEND_URL,
     DEFAULT_MIN_CONFIDENCE,
     DOMAIN,
@@ -33,19 +36,121 @@ from .const import (
     ENTRY_TYPE_STT,
 )
 
+_ENTITY_PREFIX = {
+    CONF_STT_ENTITY: "stt.",
+    CONF_CONVERSATION_ENTITY: "conversation.",
+}
+_ENTITY_ERROR = {
+    CONF_STT_ENTITY: "not_stt_entity",
+    CONF_CONVERSATION_ENTITY: "not_conversation_entity",
+}
+
+_USERS_CACHE_TTL = 5.0
+
+_STT_ENTITY_SELECTOR = selector.EntitySelector(
+    selector.EntitySelectorConfig(
+        domain=Platform.STT,
+    ),
+)
+_CONVERSATION_ENTITY_SELECTOR = selector.EntitySelector(
+    selector.EntitySelectorConfig(
+        domain="conversation",
+    ),
+)
+_MIN_CONFIDENCE_SELECTOR = selector.NumberSelector(
+    selector.NumberSelectorConfig(
+        min=0.0,
+        max=1.0,
+        step=0.05,
+        mode=selector.NumberSelectorMode.SLIDER,
+    )
+)
+
+_ADD_STT_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_STT_ENTITY): _STT_ENTITY_SELECTOR,
+    }
+)
+_ADD_CONVERSATION_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_CONVERSATION_ENTITY): _CONVERSATION_ENTITY_SELECTOR,
+        vol.Required(
+            CONF_MIN_CONFIDENCE, default=DEFAULT_MIN_CONFIDENCE
+        ): _MIN_CONFIDENCE_SELECTOR,
+    }
+)
+
+
+@lru_cache(maxsize=32)
+def _build_stt_options_schema(stt_entity: str | None) -> vol.Schema:
+    """Build the STT proxy options schema for the current values."""
+    return vol.Schema(
+        {
+            vol.Required(CONF_STT_ENTITY, default=stt_entity): _STT_ENTITY_SELECTOR,
+        }
+    )
+
+
+@lru_cache(maxsize=32)
+def _build_conversation_options_schema(
+    conversation_entity: str | None, min_confidence: float
+) -> vol.Schema:
+    """Build the Conversation proxy options schema for the current values."""
+    return vol.Schema(
+        {
+            vol.Required(
+                CONF_CONVERSATION_ENTITY, default=conversation_entity
+            ): _CONVERSATION_ENTITY_SELECTOR,
+            vol.Required(
+                CONF_MIN_CONFIDENCE, default=min_confidence
+            ): _MIN_CONFIDENCE_SELECTOR,
+        }
+    )
+
+
+def _validate_entity(user_input: dict[str, Any], key: str) -> str | None:
+    """Return the error key if the selected entity has the wrong domain."""
+    if not user_input[key].startswith(_ENTITY_PREFIX[key]):
+        return _ENTITY_ERROR[key]
+    return None
+
 
 async def _build_voice_samples_schema(
     hass: HomeAssistant, default_samples: list | None = None
 ) -> selector.ObjectSelector:
-    """Build the voice samples selector schema."""
+    """Build the voice samples selector schema.
+
+    The selector only depends on the set of users, so it is cached in hass.data
+    and rebuilt only when users are added, renamed or removed. Users are not
+    fetched again for a few seconds, which covers re-renders within a flow.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    now = hass.loop.time()
+
+    if (cached := domain_data.get(DATA_USERS_SCHEMA)) is not None:
+        cached_time, cached_fingerprint, cached_selector = cached
+        if now - cached_time < _USERS_CACHE_TTL:
+            return cached_selector
+
     users = await hass.auth.async_get_users()
-    user_options = [
-        selector.SelectOptionDict(value=user.id, label=user.name or user.id)
-        for user in users
-        if not user.system_generated
-    ]
+    users_fingerprint = frozenset(
+        (user.id, user.name, user.system_generated) for user in users
+    )
+
+    if cached is not None and cached_fingerprint == users_fingerprint:
+        domain_data[DATA_USERS_SCHEMA] = (now, users_fingerprint, cached_selector)
+        return cached_selector
+
+    user_options = sorted(
+        (
+            selector.SelectOptionDict(value=user.id, label=user.name or user.id)
+            for user in users
+            if not user.system_generated
+        ),
+        key=lambda option: option["label"],
+    )
 
-    return selector.ObjectSelector(
+    voice_samples_selector = selector.ObjectSelector(
         selector.ObjectSelectorConfig(
             fields={
                 CONF_USER: {
@@ -70,15 +175,9 @@ async def _build_voice_samples_schema(
             label_field=CONF_USER,
         )
     )
+    domain_data[DATA_USERS_SCHEMA] = (now, users_fingerprint, voice_samples_selector)
 
-
-def _get_main_config_entry(hass: HomeAssistant) -> ConfigEntry | None:
-    """Get the main config entry if it exists."""
-    entries = hass.config_entries.async_entries(DOMAIN)
-    for entry in entries:
-        if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_MAIN:
-            return entry
-    return None
+    return voice_samples_selector
 
 
 class SpeakerRecognitionConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -91,7 +190,7 @@ class SpeakerRecognitionConfigFlow(ConfigFlow, domain=DOMAIN):
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
         """Handle the initial step."""
-        main_entry = _get_main_config_entry(self.hass)
+        main_entry = _main_entry(self.hass)
 
         if main_entry is None:
             return await self.async_step_main(user_input)
@@ -152,15 +251,16 @@ class SpeakerRecognitionConfigFlow(ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
 
         if user_input is not None:
-            if not user_input[CONF_STT_ENTITY].startswith("stt."):
-                errors["base"] = "not_stt_entity"
+            if error := _validate_entity(user_input, CONF_STT_ENTITY):
+                errors["base"] = error
             else:
                 stt_entity = user_input[CONF_STT_ENTITY]
+                stt_object_id = stt_entity.split(".", 1)[-1]
                 await self.async_set_unique_id(f"{ENTRY_TYPE_STT}_{stt_entity}")
                 self._abort_if_unique_id_configured()
 
                 return self.async_create_entry(
-                    title=f"STT: {stt_entity.split('.', 1)[-1]}",
+                    title=f"STT: {stt_object_id}",
                     data={
                         CONF_ENTRY_TYPE: ENTRY_TYPE_STT,
                         CONF_STT_ENTITY: stt_entity,
@@ -169,15 +269,7 @@ class SpeakerRecognitionConfigFlow(ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(
             step_id="add_stt",
-            data_schema=vol.Schema(
-                {
-                    vol.Required(CONF_STT_ENTITY): selector.EntitySelector(
-                        selector.EntitySelectorConfig(
-                            domain=Platform.STT,
-                        ),
-                    ),
-                }
-            ),
+            data_schema=_ADD_STT_SCHEMA,
             errors=errors,
         )
 
@@ -188,17 +280,18 @@ class SpeakerRecognitionConfigFlow(ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
 
         if user_input is not None:
-            if not user_input[CONF_CONVERSATION_ENTITY].startswith("conversation."):
-                errors["base"] = "not_conversation_entity"
+            if error := _validate_entity(user_input, CONF_CONVERSATION_ENTITY):
+                errors["base"] = error
             else:
                 conversation_entity = user_input[CONF_CONVERSATION_ENTITY]
+                conversation_object_id = conversation_entity.split(".", 1)[-1]
                 await self.async_set_unique_id(
                     f"{ENTRY_TYPE_CONVERSATION}_{conversation_entity}"
                 )
                 self._abort_if_unique_id_configured()
 
                 return self.async_create_entry(
-                    title=f"Conversation: {conversation_entity.split('.', 1)[-1]}",
+                    title=f"Conversation: {conversation_object_id}",
                     data={
                         CONF_ENTRY_TYPE: ENTRY_TYPE_CONVERSATION,
                         CONF_CONVERSATION_ENTITY: conversation_entity,
@@ -208,25 +301,7 @@ class SpeakerRecognitionConfigFlow(ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(
             step_id="add_conversation",
-            data_schema=vol.Schema(
-                {
-                    vol.Required(CONF_CONVERSATION_ENTITY): selector.EntitySelector(
-                        selector.EntitySelectorConfig(
-                            domain="conversation",
-                        ),
-                    ),
-                    vol.Required(
-                        CONF_MIN_CONFIDENCE, default=DEFAULT_MIN_CONFIDENCE
-                    ): selector.NumberSelector(
-                        selector.NumberSelectorConfig(
-                            min=0.0,
-                            max=1.0,
-                            step=0.05,
-                            mode=selector.NumberSelectorMode.SLIDER,
-                        )
-                    ),
-                }
-            ),
+            data_schema=_ADD_CONVERSATION_SCHEMA,
             errors=errors,
         )
 
@@ -267,7 +342,7 @@ class SpeakerRecognitionOptionsFlow(OptionsFlow):
                 },
             )
 
-        current_url = self.config_entry.data.get(CONF_BACKEND_URL, DEFAULT_BACKEND_URL)
+        current_url = _get_backend_url(self.config_entry)
         current_voice_samples = self.config_entry.options.get(CONF_VOICE_SAMPLES, [])
 
         voice_samples_selector = await _build_voice_samples_schema(
@@ -295,8 +370,8 @@ class SpeakerRecognitionOptionsFlow(OptionsFlow):
         errors: dict[str, str] = {}
 
         if user_input is not None:
-            if not user_input[CONF_STT_ENTITY].startswith("stt."):
-                errors["base"] = "not_stt_entity"
+            if error := _validate_entity(user_input, CONF_STT_ENTITY):
+                errors["base"] = error
             else:
                 return self.async_create_entry(
                     title="",
@@ -309,17 +384,7 @@ class SpeakerRecognitionOptionsFlow(OptionsFlow):
 
         return self.async_show_form(
             step_id="stt_options",
-            data_schema=vol.Schema(
-                {
-                    vol.Required(
-                        CONF_STT_ENTITY, default=current_stt_entity
-                    ): selector.EntitySelector(
-                        selector.EntitySelectorConfig(
-                            domain=Platform.STT,
-                        ),
-                    ),
-                }
-            ),
+            data_schema=_build_stt_options_schema(current_stt_entity),
             errors=errors,
         )
 
@@ -330,8 +395,8 @@ class SpeakerRecognitionOptionsFlow(OptionsFlow):
         errors: dict[str, str] = {}
 
         if user_input is not None:
-            if not user_input[CONF_CONVERSATION_ENTITY].startswith("conversation."):
-                errors["base"] = "not_conversation_entity"
+            if error := _validate_entity(user_input, CONF_CONVERSATION_ENTITY):
+                errors["base"] = error
             else:
                 return self.async_create_entry(
                     title="",
@@ -350,26 +415,8 @@ class SpeakerRecognitionOptionsFlow(OptionsFlow):
 
         return self.async_show_form(
             step_id="conversation_options",
-            data_schema=vol.Schema(
-                {
-                    vol.Required(
-                        CONF_CONVERSATION_ENTITY, default=current_conversation_entity
-                    ): selector.EntitySelector(
-                        selector.EntitySelectorConfig(
-                            domain="conversation",
-                        ),
-                    ),
-                    vol.Required(
-                        CONF_MIN_CONFIDENCE, default=current_min_confidence
-                    ): selector.NumberSelector(
-                        selector.NumberSelectorConfig(
-                            min=0.0,
-                            max=1.0,
-                            step=0.05,
-                            mode=selector.NumberSelectorMode.SLIDER,
-                        )
-                    ),
-                }
+            data_schema=_build_conversation_options_schema(
+                current_conversation_entity, current_min_confidence
             ),
             errors=errors,
         )
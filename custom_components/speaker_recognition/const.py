@@ -2,6 +2,10 @@
 
 DOMAIN = "speaker_recognition"
 
+# hass.data keys
+DATA_MAIN_ENTRY_ID = "main_entry_id"
+DATA_USERS_SCHEMA = "users_schema"
+
 # Configuration keys
 CONF_BACKEND_URL = "backend_url"
 CONF_VOICE_SAMPLES = "voice_samples"
@@ -24,3 +28,6 @@ CONF_MIN_CONFIDENCE = "min_confidence"
 # Defaults
 DEFAULT_BACKEND_URL = "http://localhost:8099"
 DEFAULT_MIN_CONFIDENCE = 0.0
+
+# Events
+EVENT_SPEAKER_RECOGNITION_DETECTED = "speaker_recognition_detected"
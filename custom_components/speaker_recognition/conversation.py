@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+from dataclasses import replace
 import logging
+import time
 
 from homeassistant.components import conversation
 from homeassistant.components.conversation import (
@@ -25,26 +27,18 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers.intent import IntentResponse, IntentResponseErrorCode
 
+from . import _main_entry
 from .const import (
     CONF_CONVERSATION_ENTITY,
-    CONF_ENTRY_TYPE,
     CONF_MIN_CONFIDENCE,
     DEFAULT_MIN_CONFIDENCE,
-    DOMAIN,
-    ENTRY_TYPE_MAIN,
 )
 from .recognition import SpeakerRecognition
 
 _LOGGER = logging.getLogger(__name__)
 
-
-def _get_main_entry(hass: HomeAssistant) -> ConfigEntry | None:
-    """Get the main config entry."""
-    entries = hass.config_entries.async_entries(DOMAIN)
-    for entry in entries:
-        if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_MAIN:
-            return entry
-    return None
+# Recognition results older than 5 seconds are not used for enrichment
+_RESULT_MAX_AGE_NS = 5_000_000_000
 
 
 async def async_setup_entry(
@@ -57,7 +51,7 @@ async def async_setup_entry(
     conversation_entity_id = config_entry.data[CONF_CONVERSATION_ENTITY]
     entity_id = er.async_validate_entity_id(registry, conversation_entity_id)
 
-    main_entry = _get_main_entry(hass)
+    main_entry = _main_entry(hass)
     if main_entry is None:
         _LOGGER.error("Main config entry not found")
         return
@@ -122,6 +116,13 @@ class SpeakerRecognitionConversationEntity(
         self._conversation_entity_id = conversation_entity_id
         self._config_entry = config_entry
         self._main_entry = main_entry
+        # Options updates reload the entry, which recreates this entity
+        self._min_confidence = float(
+            config_entry.options.get(
+                CONF_MIN_CONFIDENCE,
+                config_entry.data.get(CONF_MIN_CONFIDENCE, DEFAULT_MIN_CONFIDENCE),
+            )
+        )
 
         self._cached_languages: list[str] | None | str = None
 
@@ -133,7 +134,7 @@ class SpeakerRecognitionConversationEntity(
     @property
     def min_confidence(self) -> float:
         """Get minimum confidence threshold."""
-        return self._config_entry.data.get(CONF_MIN_CONFIDENCE, DEFAULT_MIN_CONFIDENCE)
+        return self._min_confidence
 
     @callback
     def _async_update_properties(self) -> None:
@@ -147,8 +148,13 @@ class SpeakerRecognitionConversationEntity(
     @callback
     def _async_state_changed_listener(
         self, event: Event[EventStateChangedData] | None = None
-    ) -> None:
-        """Handle source entity state changes."""
+    ) -> bool:
+        """Handle source entity state changes.
+
+        Returns whether the availability of the entity changed.
+        """
+        was_available = self._attr_available
+
         if (
             state := self.hass.states.get(self._conversation_entity_id)
         ) is None or state.state == STATE_UNAVAILABLE:
@@ -159,6 +165,8 @@ class SpeakerRecognitionConversationEntity(
             if self._cached_languages is None:
                 self._async_update_properties()
 
+        return self._attr_available != was_available
+
     async def async_added_to_hass(self) -> None:
         """Handle entity added to hass."""
         await super().async_added_to_hass()
@@ -168,8 +176,8 @@ class SpeakerRecognitionConversationEntity(
             event: Event[EventStateChangedData] | None = None,
         ) -> None:
             """Handle child updates."""
-            self._async_state_changed_listener(event)
-            self.async_write_ha_state()
+            if self._async_state_changed_listener(event):
+                self.async_write_ha_state()
 
         self.async_on_remove(
             async_track_state_change_event(
@@ -202,25 +210,19 @@ class SpeakerRecognitionConversationEntity(
 
         # Check if we should enrich the user_id with speaker recognition
         # Check for speaker recognition data
-        speaker_data = self.hass.data.get("speaker_recognition", {}).get("last_result")
+        speaker_data = self.recognition.last_result
 
         if speaker_data:
-            # Get minimum confidence from options or data
-            min_confidence = self._config_entry.options.get(
-                CONF_MIN_CONFIDENCE,
-                self._config_entry.data.get(CONF_MIN_CONFIDENCE, 0.7),
-            )
-
+            min_confidence = self._min_confidence
             confidence = speaker_data.get("confidence", 0)
             recognized_user_id = speaker_data.get("user_id")
 
             # Check if confidence is above threshold
             if confidence >= min_confidence and recognized_user_id:
                 # Check if result is recent (within last 5 seconds)
-                timestamp = speaker_data.get("timestamp", 0)
-                age = self.hass.loop.time() - timestamp
+                age_ns = time.monotonic_ns() - speaker_data["timestamp_ns"]
 
-                if age < 5.0:  # 5 second window
+                if age_ns < _RESULT_MAX_AGE_NS:
                     # Enrich if: no user_id OR different user_id from recognition
                     should_enrich = (
                         user_input.context.user_id is None
@@ -244,18 +246,11 @@ class SpeakerRecognitionConversationEntity(
                         )
 
                         # Create new input with enriched context
-                        user_input = ConversationInput(
-                            text=user_input.text,
-                            context=enriched_context,
-                            conversation_id=user_input.conversation_id,
-                            device_id=user_input.device_id,
-                            satellite_id=user_input.satellite_id,
-                            language=user_input.language,
-                            agent_id=user_input.agent_id,
-                            extra_system_prompt=user_input.extra_system_prompt,
-                        )
+                        user_input = replace(user_input, context=enriched_context)
                 else:
-                    _LOGGER.debug("Speaker recognition data too old: %.1f seconds", age)
+                    _LOGGER.debug(
+                        "Speaker recognition data too old: %.1f seconds", age_ns / 1e9
+                    )
             else:
                 _LOGGER.debug(
                     "Speaker recognition confidence %.3f below threshold %.3f",
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import logging
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
+import httpx
 from speaker_recognition import SpeakerRecognitionClient
 from speaker_recognition.models import (
     AudioInput,
@@ -16,13 +18,14 @@ from speaker_recognition.models import (
     VoiceSample,
 )
 
+from .const import DEFAULT_BACKEND_URL
+
 if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
     from homeassistant.core import HomeAssistant
 
 _LOGGER = logging.getLogger(__name__)
 
-DEFAULT_ADDON_URL = "http://localhost:8099"
-
 
 class SpeakerRecognition:
     """Handle speaker recognition from audio data."""
@@ -31,7 +34,7 @@ class SpeakerRecognition:
         self,
         hass: HomeAssistant,
         voice_samples: list[dict],
-        base_url: str = DEFAULT_ADDON_URL,
+        base_url: str = DEFAULT_BACKEND_URL,
     ) -> None:
         """Initialize speaker recognition.
 
@@ -42,11 +45,53 @@ class SpeakerRecognition:
         """
         self.hass = hass
         self.voice_samples = voice_samples
+        self.base_url = base_url
         self._trained = False
         self._client = SpeakerRecognitionClient(base_url=base_url, timeout=300.0)
+        self.training_done = asyncio.Event()
+        self._train_task: asyncio.Task[None] | None = None
+        self.last_result: dict[str, Any] | None = None
+
+        if not voice_samples:
+            self.training_done.set()
+
+    @property
+    def is_trained(self) -> bool:
+        """Return whether the last training succeeded."""
+        return self._trained
+
+    def async_start_training(self, entry: ConfigEntry) -> None:
+        """Train in a background task, replacing any training still running.
+
+        Args:
+            entry: Config entry the training task belongs to
+        """
+        self._cancel_training()
+        self._train_task = entry.async_create_background_task(
+            self.hass, self.async_train(), name="speaker_recognition_train"
+        )
+
+    def _cancel_training(self) -> None:
+        """Cancel a running training task."""
+        if self._train_task is not None and not self._train_task.done():
+            self._train_task.cancel()
+        self._train_task = None
 
     async def async_train(self) -> None:
         """Train the speaker recognition model with configured voice samples."""
+        cancelled = False
+        try:
+            await self._async_train()
+        except asyncio.CancelledError:
+            # Superseded by a newer training, which will set training_done
+            cancelled = True
+            raise
+        finally:
+            if not cancelled:
+                self.training_done.set()
+
+    async def _async_train(self) -> None:
+        """Send the configured voice samples to the service for training."""
         _LOGGER.debug(
             "Training speaker recognition with %d voice samples",
             len(self.voice_samples),
@@ -96,14 +141,14 @@ class SpeakerRecognition:
             request = TrainingRequest(voice_samples=voice_sample_models)
             result = await self._client.train(request)
 
-        except (OSError, ValueError, TypeError) as error:
+        except (httpx.HTTPError, OSError, ValueError, TypeError) as error:
             _LOGGER.error("Error during training: %s", error)
             self._trained = False
         else:
             self._trained = True
             _LOGGER.info(
                 "Speaker recognition training completed: %d users trained",
-                result.users_trained,
+                result.count,
             )
 
     async def async_recognize(
@@ -152,6 +197,13 @@ class SpeakerRecognition:
         Args:
             voice_samples: New list of voice samples
         """
+        self._cancel_training()
         self.voice_samples = voice_samples
         self._trained = False
+
+        if voice_samples:
+            self.training_done.clear()
+        else:
+            self.training_done.set()
+
         _LOGGER.info("Voice samples updated, retraining required")
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from collections.abc import AsyncIterable
 import logging
+import time
 
 from homeassistant.components.stt import (
     AudioBitRates,
@@ -24,21 +25,13 @@ from homeassistant.helpers import device_registry as dr, entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.event import async_track_state_change_event
 
-from .const import CONF_ENTRY_TYPE, CONF_STT_ENTITY, DOMAIN, ENTRY_TYPE_MAIN
+from . import _main_entry
+from .const import CONF_STT_ENTITY, EVENT_SPEAKER_RECOGNITION_DETECTED
 from .recognition import SpeakerRecognition
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def _get_main_entry(hass: HomeAssistant) -> ConfigEntry | None:
-    """Get the main config entry."""
-    entries = hass.config_entries.async_entries(DOMAIN)
-    for entry in entries:
-        if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_MAIN:
-            return entry
-    return None
-
-
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -49,7 +42,7 @@ async def async_setup_entry(
     stt_entity_id = config_entry.data[CONF_STT_ENTITY]
     entity_id = er.async_validate_entity_id(registry, stt_entity_id)
 
-    main_entry = _get_main_entry(hass)
+    main_entry = _main_entry(hass)
     if main_entry is None:
         _LOGGER.error("Main config entry not found")
         return
@@ -128,8 +121,13 @@ class SpeakerRecognitionSTTEntity(SpeechToTextEntity):
     @callback
     def _async_state_changed_listener(
         self, event: Event[EventStateChangedData] | None = None
-    ) -> None:
-        """Handle source entity state changes."""
+    ) -> bool:
+        """Handle source entity state changes.
+
+        Returns whether the availability of the entity changed.
+        """
+        was_available = self._attr_available
+
         if (
             state := self.hass.states.get(self._stt_entity_id)
         ) is None or state.state == STATE_UNAVAILABLE:
@@ -140,6 +138,8 @@ class SpeakerRecognitionSTTEntity(SpeechToTextEntity):
             if self._cached_languages is None:
                 self._async_update_properties()
 
+        return self._attr_available != was_available
+
     async def async_added_to_hass(self) -> None:
         """Handle entity added to hass."""
         await super().async_added_to_hass()
@@ -149,8 +149,8 @@ class SpeakerRecognitionSTTEntity(SpeechToTextEntity):
             event: Event[EventStateChangedData] | None = None,
         ) -> None:
             """Handle child updates."""
-            self._async_state_changed_listener(event)
-            self.async_write_ha_state()
+            if self._async_state_changed_listener(event):
+                self.async_write_ha_state()
 
         self.async_on_remove(
             async_track_state_change_event(
@@ -226,6 +226,11 @@ class SpeakerRecognitionSTTEntity(SpeechToTextEntity):
 
         # Perform speaker recognition on the collected audio
         if audio_buffer:
+            # Training runs in the background, don't hold the result back for it
+            if not self.recognition.training_done.is_set():
+                _LOGGER.debug("Speaker recognition training still in progress")
+                return result
+
             try:
                 recognition_result = await self.recognition.async_recognize(
                     bytes(audio_buffer), sample_rate=metadata.sample_rate
@@ -245,7 +250,7 @@ class SpeakerRecognitionSTTEntity(SpeechToTextEntity):
 
                     # Fire an event with the recognition result
                     self.hass.bus.async_fire(
-                        "speaker_recognition_detected",
+                        EVENT_SPEAKER_RECOGNITION_DETECTED,
                         {
                             "user_id": recognition_result.user_id,
                             "confidence": recognition_result.confidence,
@@ -255,12 +260,10 @@ class SpeakerRecognitionSTTEntity(SpeechToTextEntity):
                     )
 
                     # Store the most recent recognition result for potential conversation use
-                    if "speaker_recognition" not in self.hass.data:
-                        self.hass.data["speaker_recognition"] = {}
-                    self.hass.data["speaker_recognition"]["last_result"] = {
+                    self.recognition.last_result = {
                         "user_id": recognition_result.user_id,
                         "confidence": recognition_result.confidence,
-                        "timestamp": self.hass.loop.time(),
+                        "timestamp_ns": time.monotonic_ns(),
                     }
                 else:
                     _LOGGER.error("Speaker recognition returned no result")
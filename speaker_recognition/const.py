@@ -11,3 +11,6 @@ DEFAULT_PORT = 8099
 DEFAULT_LOG_LEVEL = "INFO"
 DEFAULT_ACCESS_LOG = True
 DEFAULT_EMBEDDINGS_DIR = "./embeddings"
+
+# Bump when the encoder or preprocessing changes to invalidate cached embeddings
+EMBEDDING_CACHE_VERSION = 1
@@ -1,13 +1,23 @@
 """Speaker recognition logic."""
 
 import base64
+import hashlib
 import logging
+import os
+import re
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 
 import numpy as np
+import torch
 from numpy.typing import NDArray
 from resemblyzer import VoiceEncoder, preprocess_wav  # type: ignore[import-untyped]
+from resemblyzer.hparams import sampling_rate  # type: ignore[import-untyped]
 
+from speaker_recognition.const import EMBEDDING_CACHE_VERSION
 from speaker_recognition.models import (
     AudioInput,
     Config,
@@ -15,11 +25,78 @@ from speaker_recognition.models import (
     RecognitionResult,
     TrainingRequest,
     TrainingResult,
+    VoiceSample,
     config,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+_ENCODER: Optional[VoiceEncoder] = None
+_ENCODER_LOCK = threading.Lock()
+_EMBED_LOCK = threading.Lock()
+
+# Size of a .npy header, cached files no larger than this hold no embedding
+_NPY_HEADER_SIZE = 128
+
+# Names of files written by the embedding cache, including older cache versions,
+# leftover temporary files from interrupted writes and the per-user embeddings
+# of the previous cache layout
+_CACHE_FILE_PATTERN = re.compile(
+    r".+_(?:[0-9a-f]{32}_v\d+\.npy(?:\.tmp)?|embedding\.npy)"
+)
+
+
+def _get_encoder() -> VoiceEncoder:
+    """Get the shared voice encoder, loading the model on first use.
+
+    Returns:
+        Voice encoder shared by all recognizers
+    """
+    global _ENCODER
+
+    if _ENCODER is None:
+        with _ENCODER_LOCK:
+            if _ENCODER is None:
+                _LOGGER.debug("Loading voice encoder model")
+                _ENCODER = VoiceEncoder()
+    return _ENCODER
+
+
+def _normalize(embedding: NDArray[np.float32]) -> NDArray[np.float32]:
+    """L2-normalize an embedding.
+
+    Args:
+        embedding: Embedding to normalize
+
+    Returns:
+        Unit-length embedding
+    """
+    result: NDArray[np.float32] = embedding / (
+        np.linalg.norm(embedding) + np.float32(1e-9)
+    )
+    return result
+
+
+def _embed_utterance(wav: NDArray[np.float32]) -> NDArray[np.float32]:
+    """Embed a preprocessed utterance with the shared voice encoder.
+
+    The encoder is not safe for concurrent forward passes, so calls are
+    serialized while audio preprocessing can still run in parallel. Resemblyzer
+    already returns unit-length embeddings; normalizing again only guards the
+    cosine similarity scoring against encoder changes.
+
+    Args:
+        wav: Preprocessed audio waveform
+
+    Returns:
+        Unit-length embedding of the utterance
+    """
+    encoder = _get_encoder()
+    with _EMBED_LOCK, torch.inference_mode():
+        embedding = np.asarray(encoder.embed_utterance(wav), dtype=np.float32)
+
+    return _normalize(embedding)
+
 
 class SpeakerRecognizer:
     """Handle speaker recognition operations."""
@@ -30,8 +107,9 @@ class SpeakerRecognizer:
         Args:
             config: Application configuration
         """
-        self._encoder: VoiceEncoder = VoiceEncoder()
         self._reference_embeddings: dict[str, NDArray[np.float32]] = {}
+        self._ref_user_ids: list[str] = []
+        self._ref_matrix: NDArray[np.float32] = np.empty((0, 0), dtype=np.float32)
         self._is_trained = False
         self._config = config
         self._embeddings_directory = Path(config.embeddings_directory)
@@ -66,17 +144,141 @@ class SpeakerRecognizer:
             Preprocessed audio waveform
         """
         audio_bytes = base64.b64decode(audio_input.audio_data)
-        audio_array_int16 = np.frombuffer(audio_bytes, dtype=np.int16).copy()
+        audio_array_int16 = np.frombuffer(audio_bytes, dtype=np.int16)
 
         if audio_array_int16.size == 0:
             raise ValueError("Empty audio data")
 
-        audio_array_float32 = audio_array_int16.astype(np.float32) / 32768.0
+        # Convert and scale in one pass, the result is a fresh writable array
+        audio_array_float32 = np.multiply(
+            audio_array_int16, np.float32(1.0 / 32768.0), dtype=np.float32
+        )
+
+        # Audio already at the encoder's 16 kHz rate skips the resampling step
+        source_sr: Optional[int] = audio_input.sample_rate
+        if source_sr == sampling_rate:
+            source_sr = None
+
         result: NDArray[np.float32] = preprocess_wav(
-            audio_array_float32, source_sr=audio_input.sample_rate
+            audio_array_float32, source_sr=source_sr
         )
         return result
 
+    def embedding_cache_path(self, user_id: str, audio_input: AudioInput) -> Path:
+        """Get the cache path for the embedding of a voice sample.
+
+        The path is keyed by the content hash of the audio and the embedding
+        cache version, so edited samples and encoder upgrades are re-encoded
+        while unchanged ones reuse their cached embedding.
+
+        Args:
+            user_id: User the voice sample belongs to
+            audio_input: Audio input of the voice sample
+
+        Returns:
+            Path of the cached embedding file
+        """
+        content_hash = hashlib.blake2b(digest_size=16)
+        content_hash.update(f"{audio_input.sample_rate}:".encode())
+        content_hash.update(audio_input.audio_data.encode())
+        file_name = (
+            f"{user_id}_{content_hash.hexdigest()}_v{EMBEDDING_CACHE_VERSION}.npy"
+        )
+        return self._embeddings_directory / file_name
+
+    def _save_embedding(
+        self, embedding_path: Path, embedding: NDArray[np.float32]
+    ) -> None:
+        """Atomically write an embedding to the cache.
+
+        Args:
+            embedding_path: Cache path of the embedding
+            embedding: Embedding to store
+        """
+        temporary_path = embedding_path.with_name(f"{embedding_path.name}.tmp")
+        with temporary_path.open("wb") as file:
+            np.save(file, embedding)
+        os.replace(temporary_path, embedding_path)
+
+    def _evict_embeddings(self, keep: set[Path]) -> None:
+        """Remove cached embeddings of voice samples that are no longer used.
+
+        Only files named by this cache are removed, other files in the
+        embeddings directory are left untouched.
+
+        Args:
+            keep: Cache paths of the current voice samples
+        """
+        for embedding_path in self._embeddings_directory.iterdir():
+            if (
+                embedding_path not in keep
+                and _CACHE_FILE_PATTERN.fullmatch(embedding_path.name) is not None
+            ):
+                _LOGGER.debug(f"Removing stale embedding {embedding_path}")
+                embedding_path.unlink(missing_ok=True)
+
+    def _load_embedding(self, embedding_path: Path) -> Optional[NDArray[np.float32]]:
+        """Load an embedding from the cache.
+
+        Unreadable cache files are removed so the sample is encoded again.
+
+        Args:
+            embedding_path: Cache path of the embedding
+
+        Returns:
+            Cached embedding, or None if it is missing or unreadable
+        """
+        try:
+            if os.stat(embedding_path).st_size <= _NPY_HEADER_SIZE:
+                raise ValueError("File too small to hold an embedding")
+
+            _LOGGER.debug(f"Loading cached embedding from {embedding_path}")
+            loaded_data = np.load(embedding_path, mmap_mode="r", allow_pickle=False)
+            embedding: NDArray[np.float32] = loaded_data.astype(np.float32, copy=False)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError) as error:
+            _LOGGER.warning(
+                f"Discarding unreadable embedding {embedding_path}: {error}"
+            )
+            embedding_path.unlink(missing_ok=True)
+            return None
+
+        return embedding
+
+    def _embed_sample(
+        self, sample: VoiceSample, embedding_path: Path
+    ) -> Optional[NDArray[np.float32]]:
+        """Get the embedding of a voice sample, using the cache if possible.
+
+        Args:
+            sample: Voice sample to embed
+            embedding_path: Cache path of the embedding
+
+        Returns:
+            Embedding of the voice sample, or None if it could not be processed
+        """
+        user_id = sample.user
+        _LOGGER.info(f"Processing voice sample for user: {user_id}")
+
+        try:
+            embedding = self._load_embedding(embedding_path)
+
+            if embedding is None:
+                _LOGGER.debug("Creating embedding from audio input")
+                wav = self.process_audio_input(sample.audio)
+                embedding = _embed_utterance(wav)
+
+                self._save_embedding(embedding_path, embedding)
+                _LOGGER.debug(f"Embedding cached to {embedding_path}")
+
+        except Exception as error:
+            _LOGGER.error(f"Error processing voice sample for user {user_id}: {error}")
+            return None
+
+        _LOGGER.info(f"Successfully trained voice sample for user: {user_id}")
+        return embedding
+
     def train(self, request: TrainingRequest) -> TrainingResult:
         """Train the speaker recognition model.
 
@@ -94,38 +296,40 @@ class SpeakerRecognizer:
         self._reference_embeddings = {}
         _LOGGER.info(f"Training with {len(request.voice_samples)} voice samples")
 
-        for sample in request.voice_samples:
-            user_id = sample.user
-            audio_input = sample.audio
-
-            _LOGGER.info(f"Processing voice sample for user: {user_id}")
+        embedding_paths = [
+            self.embedding_cache_path(sample.user, sample.audio)
+            for sample in request.voice_samples
+        ]
 
-            try:
-                embedding: NDArray[np.float32]
-                embedding_path = self._embeddings_directory / f"{user_id}_embedding.npy"
+        # Decode and preprocess samples in parallel, encoder passes are serialized
+        max_workers = min(len(request.voice_samples), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            embeddings = list(
+                executor.map(self._embed_sample, request.voice_samples, embedding_paths)
+            )
 
-                if embedding_path.exists():
-                    _LOGGER.debug(f"Loading cached embedding from {embedding_path}")
-                    loaded_data = np.load(embedding_path, allow_pickle=False)
-                    embedding = np.asarray(loaded_data)
-                else:
-                    _LOGGER.debug("Creating embedding from audio input")
-                    wav = self.process_audio_input(audio_input)
-                    embedding = np.asarray(self._encoder.embed_utterance(wav))
+        user_embeddings: defaultdict[str, list[NDArray[np.float32]]] = defaultdict(list)
+        for sample, embedding in zip(request.voice_samples, embeddings):
+            if embedding is not None:
+                user_embeddings[sample.user].append(embedding)
 
-                    np.save(embedding_path, embedding)
-                    _LOGGER.debug(f"Embedding cached to {embedding_path}")
+        # Average the sample embeddings of each user like embed_speaker does,
+        # reusing the cached per-sample embeddings instead of re-encoding
+        for user_id, sample_embeddings in user_embeddings.items():
+            self._reference_embeddings[user_id] = _normalize(
+                np.mean(sample_embeddings, axis=0, dtype=np.float32)
+            )
 
-                self._reference_embeddings[user_id] = embedding
-                _LOGGER.info(f"Successfully trained voice sample for user: {user_id}")
+        self._evict_embeddings(set(embedding_paths))
 
-            except Exception as error:
-                _LOGGER.error(
-                    f"Error processing voice sample for user {user_id}: {error}"
-                )
-                continue
+        self._ref_user_ids = list(self._reference_embeddings)
 
         if self._reference_embeddings:
+            # Stack the references into one (users, dim) matrix for scoring
+            self._ref_matrix = np.ascontiguousarray(
+                np.stack(list(self._reference_embeddings.values()), axis=0),
+                dtype=np.float32,
+            )
             self._is_trained = True
             _LOGGER.info(
                 f"Training completed for {len(self._reference_embeddings)} users"
@@ -152,18 +356,20 @@ class SpeakerRecognizer:
             raise RuntimeError("Model not trained")
 
         wav = self.process_audio_input(request.audio)
-        chunk_embedding = self._encoder.embed_utterance(wav)
+        chunk_embedding = _embed_utterance(wav)
 
-        scores: dict[str, float] = {}
-        for user_id, reference_embedding in self._reference_embeddings.items():
-            similarity = float(np.dot(reference_embedding, chunk_embedding))
-            scores[user_id] = similarity
+        # Both operands are float32 so the product runs as a single-precision GEMV
+        assert self._ref_matrix.dtype == np.float32
+        similarities = self._ref_matrix @ chunk_embedding
 
-        if not scores:
+        if similarities.size == 0:
             raise RuntimeError("No scores calculated")
 
-        best_user = max(scores, key=lambda user: scores[user])
-        best_score = scores[best_user]
+        values: list[float] = similarities.tolist()
+        best_index = int(similarities.argmax())
+        best_user = self._ref_user_ids[best_index]
+        best_score = values[best_index]
+        scores = dict(zip(self._ref_user_ids, values))
 
         _LOGGER.debug(f"Recognition scores: {scores}")
 
@@ -5,16 +5,20 @@ import wave
 from multiprocessing import Process
 from pathlib import Path
 
+import numpy as np
 import pytest
 import uvicorn
 
 from speaker_recognition import SpeakerRecognitionClient
+from speaker_recognition import recognizer as recognizer_module
 from speaker_recognition.models import (
     AudioInput,
+    Config,
     RecognitionRequest,
     TrainingRequest,
     VoiceSample,
 )
+from speaker_recognition.recognizer import SpeakerRecognizer
 
 EXAMPLE_DATA_DIR = Path(__file__).parent.parent / "example_data"
 API_HOST = "127.0.0.1"
@@ -44,6 +48,29 @@ def read_audio_file_as_base64(file_path: Path) -> tuple[str, int]:
         return base64.b64encode(pcm_data).decode("utf-8"), sample_rate
 
 
+def read_voice_sample(user: str, file_name: str) -> VoiceSample:
+    """Read an example WAV file as voice sample.
+
+    Args:
+        user: User the voice sample belongs to
+        file_name: Name of the WAV file in the example data directory
+
+    Returns:
+        Voice sample with the PCM audio of the file
+    """
+    audio_data, sample_rate = read_audio_file_as_base64(EXAMPLE_DATA_DIR / file_name)
+    return VoiceSample(
+        user=user,
+        audio=AudioInput(audio_data=audio_data, sample_rate=sample_rate),
+    )
+
+
+@pytest.fixture
+def recognizer(tmp_path: Path) -> SpeakerRecognizer:
+    """Create a speaker recognizer with an empty embeddings directory."""
+    return SpeakerRecognizer(config=Config(embeddings_directory=str(tmp_path)))
+
+
 @pytest.fixture(scope="module")
 def api_server():
     """Start API server for testing."""
@@ -164,3 +191,152 @@ async def test_train_and_recognize_speakers(api_server: None):
             f"with confidence {recognition_result_2.confidence}. "
             f"All scores: {recognition_result_2.all_scores}"
         )
+
+
+def test_train_user_with_multiple_samples(recognizer: SpeakerRecognizer):
+    """Test that all voice samples of a user contribute to its reference."""
+    speaker1_sample_1 = read_voice_sample("speaker1", "speaker1_1.wav")
+    speaker1_sample_2 = read_voice_sample("speaker1", "speaker1_2.wav")
+    speaker2_sample = read_voice_sample("speaker2", "speaker2_1.wav")
+
+    training_result = recognizer.train(
+        TrainingRequest(
+            voice_samples=[speaker1_sample_1, speaker1_sample_2, speaker2_sample]
+        )
+    )
+    assert training_result.status == "success"
+    assert training_result.count == 2
+    assert sorted(training_result.trained_users) == ["speaker1", "speaker2"]
+
+    # One cache file per voice sample
+    assert len(list(recognizer.embeddings_directory.iterdir())) == 3
+
+    # The reference of speaker1 is the normalized mean of both samples
+    sample_embeddings = [
+        np.load(recognizer.embedding_cache_path(sample.user, sample.audio))
+        for sample in (speaker1_sample_1, speaker1_sample_2)
+    ]
+    expected_embedding = np.mean(sample_embeddings, axis=0)
+    expected_embedding /= np.linalg.norm(expected_embedding)
+
+    speaker2_reference = np.load(
+        recognizer.embedding_cache_path(speaker2_sample.user, speaker2_sample.audio)
+    )
+    recognition_result = recognizer.recognize(
+        RecognitionRequest(audio=speaker1_sample_1.audio)
+    )
+    assert recognition_result.user_id == "speaker1"
+
+    # Scores are cosine similarities against the combined reference
+    query_embedding = sample_embeddings[0]
+    assert recognition_result.all_scores["speaker1"] == pytest.approx(
+        float(np.dot(expected_embedding, query_embedding)), abs=1e-5
+    )
+    assert recognition_result.all_scores["speaker2"] == pytest.approx(
+        float(np.dot(speaker2_reference, query_embedding)), abs=1e-5
+    )
+
+
+def test_train_reuses_cached_embeddings(
+    recognizer: SpeakerRecognizer, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that training again reuses the cached embeddings of its samples."""
+    training_request = TrainingRequest(
+        voice_samples=[
+            read_voice_sample("speaker1", "speaker1_1.wav"),
+            read_voice_sample("speaker2", "speaker2_1.wav"),
+        ]
+    )
+    first_result = recognizer.train(training_request)
+
+    cache_files = {
+        path: path.stat().st_mtime_ns
+        for path in recognizer.embeddings_directory.iterdir()
+    }
+    assert set(cache_files) == {
+        recognizer.embedding_cache_path(sample.user, sample.audio)
+        for sample in training_request.voice_samples
+    }
+
+    def fail_embed_utterance(wav: object) -> None:
+        raise AssertionError("Cached voice sample was encoded again")
+
+    monkeypatch.setattr(
+        "speaker_recognition.recognizer._embed_utterance", fail_embed_utterance
+    )
+
+    second_result = recognizer.train(training_request)
+    assert second_result.trained_users == first_result.trained_users
+
+    # Cache files were neither rewritten nor removed
+    assert {
+        path: path.stat().st_mtime_ns
+        for path in recognizer.embeddings_directory.iterdir()
+    } == cache_files
+
+
+def test_train_evicts_removed_samples(recognizer: SpeakerRecognizer):
+    """Test that cached embeddings of removed samples are deleted."""
+    kept_sample = read_voice_sample("speaker1", "speaker1_1.wav")
+    removed_sample = read_voice_sample("speaker1", "speaker1_2.wav")
+
+    recognizer.train(TrainingRequest(voice_samples=[kept_sample, removed_sample]))
+
+    kept_path = recognizer.embedding_cache_path(kept_sample.user, kept_sample.audio)
+    removed_path = recognizer.embedding_cache_path(
+        removed_sample.user, removed_sample.audio
+    )
+    assert kept_path.exists()
+    assert removed_path.exists()
+
+    # Files not written by the cache are left alone
+    unrelated_path = recognizer.embeddings_directory / "unrelated.npy"
+    np.save(unrelated_path, np.zeros(3))
+
+    # Embeddings of the previous per-user cache layout are obsolete
+    legacy_path = recognizer.embeddings_directory / "speaker1_embedding.npy"
+    np.save(legacy_path, np.zeros(3))
+
+    recognizer.train(TrainingRequest(voice_samples=[kept_sample]))
+
+    assert kept_path.exists()
+    assert not removed_path.exists()
+    assert not legacy_path.exists()
+    assert unrelated_path.exists()
+
+
+@pytest.mark.parametrize("cache_content", [b"", b"\x93NUMPY" + b"\x00" * 256])
+def test_train_reencodes_unreadable_cache(
+    recognizer: SpeakerRecognizer,
+    monkeypatch: pytest.MonkeyPatch,
+    cache_content: bytes,
+):
+    """Test that a sample whose cached embedding is unreadable is encoded again."""
+    sample = read_voice_sample("speaker1", "speaker1_1.wav")
+    training_request = TrainingRequest(voice_samples=[sample])
+    recognizer.train(training_request)
+
+    embedding_path = recognizer.embedding_cache_path(sample.user, sample.audio)
+    expected_embedding = np.load(embedding_path)
+
+    # Truncate or corrupt the cached embedding
+    embedding_path.write_bytes(cache_content)
+
+    embed_utterance = recognizer_module._embed_utterance
+    encoded_count = 0
+
+    def count_embed_utterance(wav: np.ndarray) -> np.ndarray:
+        nonlocal encoded_count
+        encoded_count += 1
+        return embed_utterance(wav)
+
+    monkeypatch.setattr(recognizer_module, "_embed_utterance", count_embed_utterance)
+
+    training_result = recognizer.train(training_request)
+    assert encoded_count == 1
+    assert training_result.status == "success"
+    assert training_result.count == 1
+    assert training_result.trained_users == ["speaker1"]
+
+    # The cache file was rewritten with the new embedding
+    np.testing.assert_allclose(np.load(embedding_path), expected_embedding, atol=1e-5)